@@ -1,10 +1,11 @@
 """配置管理模块 - 支持 YAML 配置文件"""
 
+import os
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any
 
-import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # 默认配置文件路径
@@ -56,6 +57,8 @@ DEFAULT_USER_PROMPT_TEMPLATE = """请根据以下本周（{week_start} 至 {week
 class NotionConfig(BaseModel):
     """Notion 配置"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     token: str = Field(description="Notion Integration Token")
     task_tracker_database_id: str = Field(
         default="2b736dfe-5c6e-80e9-8b29-000b666d8ece",
@@ -70,6 +73,8 @@ class NotionConfig(BaseModel):
 class PromptConfig(BaseModel):
     """AI 提示词配置"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     system_prompt: str = Field(
         default=DEFAULT_SYSTEM_PROMPT,
         description="系统提示词，定义 AI 的角色和输出格式",
@@ -86,11 +91,17 @@ class PromptConfig(BaseModel):
         default=1500,
         description="最大生成 token 数",
     )
+    batch_size: int = Field(
+        default=0,
+        description="分批并发生成时每批包含的顶级任务数，0 表示不分批",
+    )
 
 
 class DeepSeekConfig(BaseModel):
     """DeepSeek 配置"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     api_key: str = Field(description="DeepSeek API Key")
     base_url: str = Field(
         default="https://api.deepseek.com",
@@ -105,6 +116,8 @@ class DeepSeekConfig(BaseModel):
 class GitHubConfig(BaseModel):
     """GitHub 配置"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     token: str | None = Field(
         default=None,
         description="GitHub Personal Access Token（可选，用于提高 API 限制）",
@@ -118,6 +131,8 @@ class GitHubConfig(BaseModel):
 class ScheduleConfig(BaseModel):
     """定时任务配置"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     day: str = Field(
         default="friday",
         description="定时执行日期 (monday/tuesday/wednesday/thursday/friday/saturday/sunday)",
@@ -131,6 +146,8 @@ class ScheduleConfig(BaseModel):
 class ReportConfig(BaseModel):
     """周报生成配置"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     include_in_progress: bool = Field(
         default=True,
         description="是否包含进行中的任务",
@@ -139,11 +156,21 @@ class ReportConfig(BaseModel):
         default=True,
         description="是否包含已完成的任务",
     )
+    async_mode: bool = Field(
+        default=False,
+        description="是否在生成内容的同时预先创建周报页面，生成完成后再追加内容",
+    )
+    enable_fetch_cache: bool = Field(
+        default=False,
+        description="是否将本周任务与 Git 提交缓存到磁盘（1 小时内重复运行时复用）",
+    )
 
 
 class Settings(BaseModel):
     """应用配置"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     notion: NotionConfig
     deepseek: DeepSeekConfig
     schedule: ScheduleConfig = Field(default_factory=ScheduleConfig)
@@ -151,70 +178,82 @@ class Settings(BaseModel):
     prompt: PromptConfig = Field(default_factory=PromptConfig)
     github: GitHubConfig = Field(default_factory=GitHubConfig)
 
-    # 兼容旧的属性访问方式
-    @property
+    # 兼容旧的属性访问方式（配置不可变，首次访问后缓存结果）
+    @cached_property
     def notion_token(self) -> str:
         return self.notion.token
 
-    @property
+    @cached_property
     def task_tracker_database_id(self) -> str:
         return self.notion.task_tracker_database_id
 
-    @property
+    @cached_property
     def weekly_report_database_id(self) -> str:
         return self.notion.weekly_report_database_id
 
-    @property
+    @cached_property
     def deepseek_api_key(self) -> str:
         return self.deepseek.api_key
 
-    @property
+    @cached_property
     def deepseek_base_url(self) -> str:
         return self.deepseek.base_url
 
-    @property
+    @cached_property
     def deepseek_model(self) -> str:
         return self.deepseek.model
 
-    @property
+    @cached_property
     def schedule_day(self) -> str:
         return self.schedule.day
 
-    @property
+    @cached_property
     def schedule_time(self) -> str:
         return self.schedule.time
 
-    @property
+    @cached_property
     def include_in_progress(self) -> bool:
         return self.report.include_in_progress
 
-    @property
+    @cached_property
     def include_completed(self) -> bool:
         return self.report.include_completed
 
+    @cached_property
+    def async_mode(self) -> bool:
+        return self.report.async_mode
+
+    @cached_property
+    def enable_fetch_cache(self) -> bool:
+        return self.report.enable_fetch_cache
+
     # Prompt 相关属性
-    @property
+    @cached_property
     def system_prompt(self) -> str:
         return self.prompt.system_prompt
 
-    @property
+    @cached_property
     def user_prompt_template(self) -> str:
         return self.prompt.user_prompt_template
 
-    @property
+    @cached_property
     def prompt_temperature(self) -> float:
         return self.prompt.temperature
 
-    @property
+    @cached_property
     def prompt_max_tokens(self) -> int:
         return self.prompt.max_tokens
 
+    @cached_property
+    def prompt_batch_size(self) -> int:
+        return self.prompt.batch_size
+
     # GitHub 相关属性
-    @property
+    @cached_property
     def github_token(self) -> str | None:
         return self.github.token
 
-    @property
+    @cached_property
     def github_enabled(self) -> bool:
         return self.github.enabled
 
@@ -226,8 +265,41 @@ def load_yaml_config(config_path: Path | str) -> dict[str, Any]:
     if not config_path.exists():
         raise FileNotFoundError(f"配置文件不存在: {config_path}")
 
+    # 延迟导入 yaml，仅在实际读取配置文件时加载
+    import yaml
+
+    # 优先使用 libyaml 提供的 C 实现，不可用时回退到纯 Python 版本
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
     with open(config_path, encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=loader)
+
+
+@lru_cache(maxsize=1)
+def _find_default_config() -> Path:
+    """查找默认配置文件路径（结果会被缓存，避免重复的文件系统查询）"""
+    # 尝试多个默认路径
+    possible_paths = [
+        Path("config.yaml"),
+        Path("/app/config/config.yaml"),  # Docker 挂载路径
+        Path.home() / ".config" / "notion-week-report" / "config.yaml",
+    ]
+
+    for path in possible_paths:
+        if path.exists():
+            return path
+
+    raise FileNotFoundError(
+        f"未找到配置文件，请创建 config.yaml 或指定配置文件路径。\n"
+        f"尝试的路径: {[str(p) for p in possible_paths]}"
+    )
+
+
+def _resolve_config_path(config_path: Path | str | None = None) -> Path:
+    """解析配置文件路径，未指定时使用默认路径"""
+    if config_path is not None:
+        return Path(config_path)
+    return _find_default_config()
 
 
 def get_settings(config_path: Path | str | None = None) -> Settings:
@@ -239,41 +311,39 @@ def get_settings(config_path: Path | str | None = None) -> Settings:
     Returns:
         Settings 实例
     """
-    if config_path is None:
-        # 尝试多个默认路径
-        possible_paths = [
-            Path("config.yaml"),
-            Path("/app/config/config.yaml"),  # Docker 挂载路径
-            Path.home() / ".config" / "notion-week-report" / "config.yaml",
-        ]
-
-        for path in possible_paths:
-            if path.exists():
-                config_path = path
-                break
-        else:
-            raise FileNotFoundError(
-                f"未找到配置文件，请创建 config.yaml 或指定配置文件路径。\n"
-                f"尝试的路径: {[str(p) for p in possible_paths]}"
-            )
-
+    config_path = _resolve_config_path(config_path)
     config_data = load_yaml_config(config_path)
-    return Settings(**config_data)
+    return Settings.model_validate(config_data)
 
 
-# 全局配置实例缓存
-_settings: Settings | None = None
+# 全局配置实例缓存，键为 (配置文件路径, 修改时间)
+_settings_cache: dict[tuple[str, int], Settings] = {}
 
 
 def get_cached_settings(config_path: Path | str | None = None) -> Settings:
-    """获取缓存的配置实例"""
-    global _settings
-    if _settings is None:
-        _settings = get_settings(config_path)
-    return _settings
+    """获取缓存的配置实例
+
+    配置文件未修改时直接返回缓存，跳过文件读取和 YAML 解析
+    """
+    path = _resolve_config_path(config_path)
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"配置文件不存在: {path}") from None
+
+    key = (str(path.resolve()), mtime)
+    settings = _settings_cache.get(key)
+    if settings is None:
+        settings = Settings.model_validate(load_yaml_config(path))
+        # 同一路径只保留最新版本的配置
+        for stale_key in [k for k in _settings_cache if k[0] == key[0]]:
+            del _settings_cache[stale_key]
+        _settings_cache[key] = settings
+    return settings
 
 
 def reset_settings():
     """重置配置缓存"""
-    global _settings
-    _settings = None
+    _settings_cache.clear()
+    _find_default_config.cache_clear()
@@ -1,134 +1,233 @@
 """DeepSeek API 客户端模块"""
 
-from openai import OpenAI
+import asyncio
+import string
+from collections.abc import Callable
 
 from .config import Settings
-from .notion_client import Task
+from .notion_client import Task, iter_task_tree, tree_indent
+
+# 分批生成时，各批任务先提炼为工作要点，最后再汇总成完整周报
+_BATCH_SYSTEM_PROMPT = """你是一个专业的周报撰写助手。用户会提供本周的部分任务，请将其提炼为简洁的工作要点，供后续汇总成完整周报。
+
+要求：
+1. 按「已完成」和「进行中」分组，使用 Markdown 列表，保留父子任务的层级关系
+2. 如果任务包含 Git 提交记录，根据提交内容概括实际完成的工作
+3. 只输出工作要点，不要输出标题、总结、下周计划或结尾说明
+"""
+
+
+def _compile_prompt_template(template: str) -> Callable[..., str]:
+    """预解析提示词模板，返回渲染函数
+
+    模板只解析一次，渲染时直接拼接字面文本和变量值；
+    包含位置参数、属性/索引访问或嵌套格式说明等复杂字段时回退到 str.format
+    """
+    formatter = string.Formatter()
+    parts = list(formatter.parse(template))
+
+    if any(
+        field is not None and (not field.isidentifier() or "{" in (spec or ""))
+        for _, field, spec, _ in parts
+    ):
+        return template.format
+
+    def render(**values: object) -> str:
+        chunks = []
+        for literal, field, spec, conversion in parts:
+            chunks.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion:
+                    value = formatter.convert_field(value, conversion)
+                chunks.append(format(value, spec))
+        return "".join(chunks)
+
+    return render
+
+
+def _partition_by_status(tasks: list[Task]) -> tuple[list[Task], list[Task]]:
+    """单次遍历将任务划分为已完成和进行中两组
+
+    Returns:
+        (已完成任务列表, 进行中任务列表)
+    """
+    completed: list[Task] = []
+    in_progress: list[Task] = []
+    append_completed = completed.append
+    append_in_progress = in_progress.append
+
+    for task in tasks:
+        status = task.status
+        if status == "已完成":
+            append_completed(task)
+        elif status == "进行中":
+            append_in_progress(task)
+
+    return completed, in_progress
+
+
+def _completed_first(children: list[Task]) -> list[Task]:
+    """子任务按状态排序：已完成的排在进行中的前面（其他状态不展示）"""
+    completed_children, in_progress_children = _partition_by_status(children)
+    return completed_children + in_progress_children
+
+
+def _format_task_group(tasks: list[Task]) -> list[str]:
+    """格式化任务组（包含子任务与 Git 提交信息）
+
+    已完成的父任务和进行中的父任务都显示所有子任务，已完成的子任务排在前面
+    """
+    lines = []
+
+    for task, indent in iter_task_tree(tasks, _completed_first):
+        prefix = tree_indent(indent)
+        # 如果有父任务名称（说明是子任务但父任务不在本组中），添加上下文
+        parent = (
+            f"[{task.parent_task_name}] "
+            if task.parent_task_name and indent == 0
+            else ""
+        )
+        # 添加描述
+        description = f"（{task.description}）" if task.description else ""
+
+        # 添加元信息
+        meta_parts = []
+        if task.task_type:
+            meta_parts.append(f"类型: {', '.join(task.task_type)}")
+        if task.priority:
+            meta_parts.append(f"优先级: {task.priority}")
+        if task.due_date:
+            meta_parts.append(f"截止: {task.due_date}")
+        meta = f" [{'; '.join(meta_parts)}]" if meta_parts else ""
+
+        # 一次性拼接任务基本信息
+        lines.append(f"{prefix}- {parent}{task.name}{description}{meta}")
+
+        # 添加 Git 提交信息（如果有）
+        if task.git_commits:
+            commit_prefix = tree_indent(indent + 1)
+            lines.append(f"{commit_prefix}[本周 Git 提交记录]:")
+            # 最多显示 10 条，截断过长的提交信息
+            lines.extend(
+                f"{commit_prefix}  · {c.sha}: {c.short_message(60)}"
+                for c in task.git_commits[:10]
+            )
+
+    return lines
 
 
 class DeepSeekService:
     """DeepSeek 服务类"""
 
     def __init__(self, settings: Settings):
-        self.client = OpenAI(
-            api_key=settings.deepseek_api_key,
-            base_url=settings.deepseek_base_url,
-        )
+        # 客户端在每次生成时创建：异步客户端绑定事件循环，因此保留连接参数
+        self._client_options = {
+            "api_key": settings.deepseek_api_key,
+            "base_url": settings.deepseek_base_url,
+        }
         self.model = settings.deepseek_model
         self.system_prompt = settings.system_prompt
         self.user_prompt_template = settings.user_prompt_template
+        self._render_user_prompt = _compile_prompt_template(self.user_prompt_template)
         self.temperature = settings.prompt_temperature
         self.max_tokens = settings.prompt_max_tokens
+        self.batch_size = settings.prompt_batch_size
+
+    def _build_messages(
+        self, task_descriptions: str, week_start: str, week_end: str
+    ) -> list[dict[str, str]]:
+        """根据任务描述构建生成周报的对话消息"""
+        # 使用配置的用户提示词模板
+        user_prompt = self._render_user_prompt(
+            week_start=week_start,
+            week_end=week_end,
+            task_descriptions=task_descriptions,
+        )
+
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _build_batch_messages(self, tasks: list[Task]) -> list[dict[str, str]]:
+        """构建分批提炼工作要点的对话消息"""
+        return [
+            {"role": "system", "content": _BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": self._format_tasks_for_prompt(tasks)},
+        ]
 
     def generate_weekly_report(
         self, tasks: list[Task], week_start: str, week_end: str
     ) -> str:
-        """根据任务列表生成周报"""
+        """根据任务列表生成周报
+
+        通过 asyncio.run 调用 agenerate_weekly_report，与异步版本使用相同的
+        提示词（包括 batch_size 分批）；不能在运行中的事件循环内调用
+        """
+        return asyncio.run(self.agenerate_weekly_report(tasks, week_start, week_end))
+
+    async def agenerate_weekly_report(
+        self, tasks: list[Task], week_start: str, week_end: str
+    ) -> str:
+        """根据任务列表生成周报（异步版本）
+
+        配置了 batch_size 且顶级任务数超过该值时，先按顶级任务分批并发提炼
+        工作要点（不含标题与结尾），再将各批要点按原顺序汇总，
+        使用配置的提示词生成一份完整周报。
+        """
         if not tasks:
             return self._generate_empty_report(week_start, week_end)
 
-        # 构建任务描述（支持层级）
-        task_descriptions = self._format_tasks_for_prompt(tasks)
+        from openai import AsyncOpenAI
 
-        # 使用配置的用户提示词模板
-        user_prompt = self.user_prompt_template.format(
-            week_start=week_start,
-            week_end=week_end,
-            task_descriptions=task_descriptions,
-        )
+        async with AsyncOpenAI(**self._client_options) as client:
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-        )
+            async def complete(messages: list[dict[str, str]]) -> str:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                )
+                return response.choices[0].message.content or ""
 
-        return response.choices[0].message.content or ""
+            batch_size = self.batch_size
+            if 0 < batch_size < len(tasks):
+                groups = [
+                    tasks[start : start + batch_size]
+                    for start in range(0, len(tasks), batch_size)
+                ]
+                # gather 保持输入顺序，汇总的要点与任务顺序一致
+                summaries = await asyncio.gather(
+                    *(complete(self._build_batch_messages(group)) for group in groups)
+                )
+                task_descriptions = "\n\n".join(summaries)
+            else:
+                task_descriptions = self._format_tasks_for_prompt(tasks)
+
+            return await complete(
+                self._build_messages(task_descriptions, week_start, week_end)
+            )
 
     def _format_tasks_for_prompt(self, tasks: list[Task]) -> str:
         """将任务列表格式化为提示词内容（支持层级结构）"""
         # 分离已完成和进行中的任务
-        completed_tasks = [t for t in tasks if t.status == "已完成"]
-        in_progress_tasks = [t for t in tasks if t.status == "进行中"]
+        completed_tasks, in_progress_tasks = _partition_by_status(tasks)
 
         lines = []
 
         if completed_tasks:
             lines.append("【已完成的任务】")
-            lines.extend(self._format_task_group(completed_tasks))
+            lines.extend(_format_task_group(completed_tasks))
             lines.append("")
 
         if in_progress_tasks:
             lines.append("【进行中的任务】")
-            lines.extend(self._format_task_group(in_progress_tasks))
+            lines.extend(_format_task_group(in_progress_tasks))
 
         return "\n".join(lines)
 
-    def _format_task_group(self, tasks: list[Task], indent: int = 0) -> list[str]:
-        """格式化任务组（递归处理子任务，包含 Git 提交信息）"""
-        lines = []
-        prefix = "  " * indent
-
-        for task in tasks:
-            # 构建任务基本信息
-            task_info = f"{prefix}- {task.name}"
-
-            # 如果有父任务名称（说明是子任务但父任务不在本组中），添加上下文
-            if task.parent_task_name and indent == 0:
-                task_info = f"{prefix}- [{task.parent_task_name}] {task.name}"
-
-            # 添加描述
-            if task.description:
-                task_info += f"（{task.description}）"
-
-            # 添加元信息
-            meta_parts = []
-            if task.task_type:
-                meta_parts.append(f"类型: {', '.join(task.task_type)}")
-            if task.priority:
-                meta_parts.append(f"优先级: {task.priority}")
-            if task.due_date:
-                meta_parts.append(f"截止: {task.due_date}")
-
-            if meta_parts:
-                task_info += f" [{'; '.join(meta_parts)}]"
-
-            lines.append(task_info)
-
-            # 添加 Git 提交信息（如果有）
-            if task.git_commits:
-                commit_prefix = "  " * (indent + 1)
-                lines.append(f"{commit_prefix}[本周 Git 提交记录]:")
-                for commit in task.git_commits[:10]:  # 最多显示 10 条
-                    # 截断过长的提交信息
-                    msg = (
-                        commit.message[:60] + "..."
-                        if len(commit.message) > 60
-                        else commit.message
-                    )
-                    lines.append(f"{commit_prefix}  · {commit.sha}: {msg}")
-
-            # 递归处理子任务
-            if task.children:
-                # 分离子任务的状态
-                completed_children = [c for c in task.children if c.status == "已完成"]
-                in_progress_children = [
-                    c for c in task.children if c.status == "进行中"
-                ]
-
-                # 根据当前任务组的状态决定显示哪些子任务
-                # 已完成的父任务显示所有子任务
-                # 进行中的父任务也显示所有子任务
-                all_children = completed_children + in_progress_children
-                if all_children:
-                    lines.extend(self._format_task_group(all_children, indent + 1))
-
-        return lines
-
     def _generate_empty_report(self, week_start: str, week_end: str) -> str:
         """生成空周报（无任务时）"""
         return f"""## 本周工作总结
@@ -1,21 +1,18 @@
 """GitHub API 客户端模块 - 获取仓库提交历史"""
 
+import asyncio
 import re
 from datetime import datetime
 from typing import Any
 
 import httpx
-from pydantic import BaseModel, Field
 
+from .notion_client import GitCommit
 
-class GitCommit(BaseModel):
-    """Git 提交数据模型"""
-
-    sha: str = Field(description="提交 SHA")
-    message: str = Field(description="提交信息")
-    author: str = Field(description="提交作者")
-    date: str = Field(description="提交日期")
-    url: str = Field(description="提交链接")
+try:
+    import orjson
+except ImportError:  # orjson 属于 fast 可选依赖，未安装时使用 httpx 自带的 JSON 解析
+    orjson = None
 
 
 class GitHubService:
@@ -25,6 +22,14 @@ class GitHubService:
     GITHUB_URL_PATTERN = re.compile(
         r"https?://github\.com/(?P<owner>[^/]+)/(?P<repo>[^/]+)/?.*"
     )
+    # 可直接按前缀切分的 GitHub URL 形式
+    GITHUB_URL_PREFIXES = (
+        "https://github.com/",
+        "http://github.com/",
+        "git@github.com:",
+    )
+    # 并发获取提交历史时的最大请求数（GitHub 对并发请求有二级速率限制）
+    MAX_CONCURRENT_REQUESTS = 5
 
     def __init__(self, token: str | None = None):
         """初始化 GitHub 服务
@@ -34,6 +39,28 @@ class GitHubService:
         """
         self.token = token
         self.base_url = "https://api.github.com"
+        # 复用同一个 HTTP 客户端，使多个仓库请求共享 keep-alive 连接
+        self._client = httpx.Client(timeout=30.0, headers=self._get_headers())
+        # 异步客户端在首次并发请求时创建
+        self._aclient: httpx.AsyncClient | None = None
+        # 提交历史缓存，键为 (owner, repo, since, until, per_page)
+        self._commit_cache: dict[
+            tuple[str, str, str, str, int], list[GitCommit]
+        ] = {}
+
+    def clear_cache(self) -> None:
+        """清空提交历史缓存（服务跨多次生成复用时，每次生成前调用）"""
+        self._commit_cache.clear()
+
+    def close(self) -> None:
+        """关闭底层 HTTP 连接"""
+        self._client.close()
+
+    def __enter__(self) -> "GitHubService":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def _get_headers(self) -> dict[str, str]:
         """获取请求头"""
@@ -57,17 +84,86 @@ class GitHubService:
         if not url:
             return None
 
+        # 常见形式直接按前缀切分，避免进入正则引擎
+        for prefix in self.GITHUB_URL_PREFIXES:
+            if url.startswith(prefix):
+                parts = url[len(prefix) :].split("/", 2)
+                if len(parts) >= 2 and parts[0] and parts[1]:
+                    # 移除 .git 后缀
+                    return parts[0], parts[1].removesuffix(".git")
+                return None
+
+        # 其他形式回退到正则匹配
         match = self.GITHUB_URL_PATTERN.match(url)
         if match:
-            owner = match.group("owner")
-            repo = match.group("repo")
-            # 移除 .git 后缀
-            if repo.endswith(".git"):
-                repo = repo[:-4]
-            return owner, repo
+            return match.group("owner"), match.group("repo").removesuffix(".git")
 
         return None
 
+    def _build_commit_params(
+        self,
+        since: datetime | None,
+        until: datetime | None,
+        per_page: int,
+    ) -> dict[str, Any]:
+        """构建提交历史查询参数"""
+        params: dict[str, Any] = {
+            "per_page": per_page,
+        }
+
+        if since:
+            params["since"] = since.isoformat()
+        if until:
+            params["until"] = until.isoformat()
+
+        return params
+
+    def _commit_cache_key(
+        self, owner: str, repo: str, params: dict[str, Any]
+    ) -> tuple[str, str, str, str, int]:
+        """生成提交历史缓存键"""
+        return (
+            owner,
+            repo,
+            params.get("since", ""),
+            params.get("until", ""),
+            params["per_page"],
+        )
+
+    def _parse_commits_response(
+        self, response: httpx.Response
+    ) -> list[GitCommit] | None:
+        """解析提交历史响应，触发 API 限制时返回 None 表示获取失败"""
+        if response.status_code == 404:
+            # 仓库不存在或无权限访问
+            return []
+
+        if response.status_code == 403:
+            # API 限制
+            print(f"    ⚠️ GitHub API 限制，请配置 GitHub Token")
+            return None
+
+        response.raise_for_status()
+        data = orjson.loads(response.content) if orjson else response.json()
+
+        commits = []
+        for item in data:
+            commit_data = item.get("commit") or {}
+            author_data = commit_data.get("author") or {}
+
+            commits.append(
+                GitCommit(
+                    sha=(item.get("sha") or "")[:7],  # 短 SHA
+                    # 只取第一行
+                    message=(commit_data.get("message") or "").partition("\n")[0],
+                    author=author_data.get("name") or "Unknown",
+                    date=author_data.get("date") or "",
+                    url=item.get("html_url") or "",
+                )
+            )
+
+        return commits
+
     def get_commits(
         self,
         owner: str,
@@ -89,54 +185,22 @@ class GitHubService:
             GitCommit 列表
         """
         url = f"{self.base_url}/repos/{owner}/{repo}/commits"
+        params = self._build_commit_params(since, until, per_page)
 
-        params: dict[str, Any] = {
-            "per_page": per_page,
-        }
-
-        if since:
-            params["since"] = since.isoformat()
-        if until:
-            params["until"] = until.isoformat()
+        # 同一仓库同一时间范围在一次运行中只请求一次
+        cache_key = self._commit_cache_key(owner, repo, params)
+        cached = self._commit_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(
-                    url,
-                    headers=self._get_headers(),
-                    params=params,
-                )
-
-                if response.status_code == 404:
-                    # 仓库不存在或无权限访问
-                    return []
-
-                if response.status_code == 403:
-                    # API 限制
-                    print(f"    ⚠️ GitHub API 限制，请配置 GitHub Token")
-                    return []
-
-                response.raise_for_status()
-                data = response.json()
-
-                commits = []
-                for item in data:
-                    commit_data = item.get("commit", {})
-                    author_data = commit_data.get("author", {})
-
-                    commits.append(
-                        GitCommit(
-                            sha=item.get("sha", "")[:7],  # 短 SHA
-                            message=commit_data.get("message", "").split("\n")[
-                                0
-                            ],  # 只取第一行
-                            author=author_data.get("name", "Unknown"),
-                            date=author_data.get("date", ""),
-                            url=item.get("html_url", ""),
-                        )
-                    )
-
-                return commits
+            response = self._client.get(url, params=params)
+            commits = self._parse_commits_response(response)
+            if commits is None:
+                return []
+            if response.is_success:
+                self._commit_cache[cache_key] = commits
+            return commits
 
         except httpx.HTTPStatusError as e:
             print(f"    ⚠️ 获取 {owner}/{repo} 提交历史失败: HTTP {e.response.status_code}")
@@ -176,3 +240,108 @@ class GitHubService:
             until=week_end,
         )
 
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """获取（按需创建）异步 HTTP 客户端"""
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                timeout=30.0, headers=self._get_headers()
+            )
+        return self._aclient
+
+    async def aclose(self) -> None:
+        """关闭异步 HTTP 客户端
+
+        异步客户端的连接绑定在当前事件循环上，每次 asyncio.run 结束前应调用
+        """
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    async def aget_commits(
+        self,
+        owner: str,
+        repo: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        per_page: int = 100,
+    ) -> list[GitCommit] | None:
+        """异步获取仓库提交历史，参数与 get_commits 相同
+
+        与 get_commits 不同，请求失败时返回 None，以便与本周无提交区分
+        """
+        url = f"{self.base_url}/repos/{owner}/{repo}/commits"
+        params = self._build_commit_params(since, until, per_page)
+
+        # 同一仓库同一时间范围在一次运行中只请求一次
+        cache_key = self._commit_cache_key(owner, repo, params)
+        cached = self._commit_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await self._get_async_client().get(url, params=params)
+            commits = self._parse_commits_response(response)
+            if commits is not None and response.is_success:
+                self._commit_cache[cache_key] = commits
+            return commits
+
+        except httpx.HTTPStatusError as e:
+            print(f"    ⚠️ 获取 {owner}/{repo} 提交历史失败: HTTP {e.response.status_code}")
+            return None
+        except httpx.RequestError as e:
+            print(f"    ⚠️ 请求 GitHub API 失败: {e}")
+            return None
+        except Exception as e:
+            print(f"    ⚠️ 处理提交历史时出错: {e}")
+            return None
+
+    async def aget_weekly_commits(
+        self,
+        repo_url: str,
+        week_start: datetime,
+        week_end: datetime,
+    ) -> list[GitCommit] | None:
+        """异步获取指定仓库本周的提交，参数与 get_weekly_commits 相同
+
+        请求失败时返回 None；URL 无法解析时返回空列表
+        """
+        parsed = self.parse_github_url(repo_url)
+        if not parsed:
+            return []
+
+        owner, repo = parsed
+        return await self.aget_commits(
+            owner=owner,
+            repo=repo,
+            since=week_start,
+            until=week_end,
+        )
+
+    async def aget_weekly_commits_batch(
+        self,
+        repo_urls: list[str],
+        week_start: datetime,
+        week_end: datetime,
+        max_concurrency: int | None = None,
+    ) -> dict[str, list[GitCommit] | None]:
+        """并发获取多个仓库本周的提交
+
+        Args:
+            repo_urls: GitHub 仓库 URL 列表（重复的 URL 只请求一次）
+            week_start: 本周开始时间
+            week_end: 本周结束时间
+            max_concurrency: 最大并发请求数，默认为 MAX_CONCURRENT_REQUESTS
+
+        Returns:
+            仓库 URL 到 GitCommit 列表的映射，获取失败的仓库对应 None
+        """
+        # 限制并发数，避免触发 GitHub 的速率限制
+        semaphore = asyncio.Semaphore(max_concurrency or self.MAX_CONCURRENT_REQUESTS)
+
+        async def fetch(repo_url: str) -> list[GitCommit] | None:
+            async with semaphore:
+                return await self.aget_weekly_commits(repo_url, week_start, week_end)
+
+        unique_urls = list(dict.fromkeys(repo_urls))
+        results = await asyncio.gather(*(fetch(url) for url in unique_urls))
+        return dict(zip(unique_urls, results))
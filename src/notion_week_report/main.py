@@ -3,8 +3,10 @@
 import argparse
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .notion_client import Task
+if TYPE_CHECKING:
+    from .notion_client import Task
 
 
 def main():
@@ -112,45 +114,45 @@ def run_scheduler(config_path: Path | None = None):
     start_scheduler(config_path)
 
 
-def _print_task_tree(task: Task, indent: int = 0):
-    """递归打印任务树"""
-    prefix = "   " + "  " * indent
-    status_emoji = "✅" if task.status == "已完成" else "🔄"
-
-    # 打印任务名称
-    if task.parent_task_name and indent == 0:
-        print(f"{prefix}{status_emoji} [{task.parent_task_name}] {task.name}")
-    else:
-        print(f"{prefix}{status_emoji} {task.name}")
-
-    # 打印任务详情
-    detail_prefix = prefix + "   "
-    if task.description:
-        print(f"{detail_prefix}描述: {task.description}")
-    if task.task_type:
-        print(f"{detail_prefix}类型: {', '.join(task.task_type)}")
-    if task.due_date:
-        print(f"{detail_prefix}截止: {task.due_date}")
-    if task.git_repo_url:
-        print(f"{detail_prefix}Git: {task.git_repo_url}")
-
-    # 递归打印子任务
-    for child in task.children:
-        _print_task_tree(child, indent + 1)
-
-
-def _count_all_tasks(tasks: list[Task]) -> int:
-    """递归统计所有任务数量（包括子任务）"""
-    count = len(tasks)
-    for task in tasks:
-        count += _count_all_tasks(task.children)
-    return count
+def _print_task_group(title: str, tasks: list["Task"]) -> None:
+    """打印一组任务树，整组内容一次性写入标准输出"""
+    from .notion_client import iter_task_tree, tree_indent
+
+    lines = [title]
+    for task, indent in iter_task_tree(tasks):
+        # 顶级任务之间空一行
+        if indent == 0 and len(lines) > 1:
+            lines.append("")
+
+        prefix = f"   {tree_indent(indent)}"
+        status_emoji = "✅" if task.status == "已完成" else "🔄"
+
+        # 任务名称
+        if task.parent_task_name and indent == 0:
+            lines.append(
+                f"{prefix}{status_emoji} [{task.parent_task_name}] {task.name}"
+            )
+        else:
+            lines.append(f"{prefix}{status_emoji} {task.name}")
+
+        # 任务详情
+        detail_prefix = prefix + "   "
+        if task.description:
+            lines.append(f"{detail_prefix}描述: {task.description}")
+        if task.task_type:
+            lines.append(f"{detail_prefix}类型: {', '.join(task.task_type)}")
+        if task.due_date:
+            lines.append(f"{detail_prefix}截止: {task.due_date}")
+        if task.git_repo_url:
+            lines.append(f"{detail_prefix}Git: {task.git_repo_url}")
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def preview_tasks(config_path: Path | None = None):
     """预览本周任务"""
     from .config import get_settings
-    from .notion_client import NotionService
+    from .notion_client import NotionService, iter_task_tree
 
     print("=" * 50)
     print("👀 预览本周任务")
@@ -171,7 +173,7 @@ def preview_tasks(config_path: Path | None = None):
         print("📭 本周暂无相关任务记录")
         return
 
-    total_count = _count_all_tasks(tasks)
+    total_count = sum(1 for _ in iter_task_tree(tasks))
     print(f"📋 找到 {total_count} 个任务（{len(tasks)} 个顶级任务）:\n")
 
     # 按状态分组显示
@@ -179,16 +181,10 @@ def preview_tasks(config_path: Path | None = None):
     in_progress = [t for t in tasks if t.status == "进行中"]
 
     if completed:
-        print("✅ 已完成:")
-        for task in completed:
-            _print_task_tree(task)
-            print()
+        _print_task_group("✅ 已完成:", completed)
 
     if in_progress:
-        print("🔄 进行中:")
-        for task in in_progress:
-            _print_task_tree(task)
-            print()
+        _print_task_group("🔄 进行中:", in_progress)
 
 
 if __name__ == "__main__":
@@ -1,187 +1,388 @@
 """Notion API 客户端模块"""
 
-from datetime import datetime, timedelta
+import asyncio
+import re
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
 from typing import Any
 
-from notion_client import Client
-from pydantic import BaseModel, Field
+import httpx
+from notion_client import AsyncClient, Client
+from notion_client.helpers import iterate_paginated_api
 
 from .config import Settings
 
+# Notion API 单次请求最多可携带的子 block 数量
+NOTION_MAX_CHILDREN_PER_REQUEST = 100
 
-class GitCommit(BaseModel):
-    """Git 提交数据模型（从 github_client 导入时使用）"""
+# Notion API 连接池配置
+NOTION_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
 
-    sha: str = Field(description="提交 SHA")
-    message: str = Field(description="提交信息")
-    author: str = Field(description="提交作者")
-    date: str = Field(description="提交日期")
-    url: str = Field(description="提交链接")
+# 任务树缩进预先计算的层级数：Notion 任务通过 relation 嵌套，实际深度通常不超过
+# 4 层，32 层只是留足余量的上限；超过时由 tree_indent 在运行时拼接
+TREE_INDENT_CACHE_DEPTH = 32
+_TREE_INDENTS = tuple("  " * i for i in range(TREE_INDENT_CACHE_DEPTH))
 
+# Markdown 行分类正则（匹配去除首尾空白后的行），未匹配的行按普通段落处理
+_MARKDOWN_LINE_PATTERN = re.compile(
+    r"(?:(?P<heading>#{1,3}) (?P<heading_text>.*)"
+    r"|[-*] (?P<bullet>.*)"
+    r"|\d+\. (?P<numbered>.*)"
+    r"|(?P<divider>---|\*\*\*|___))"
+)
 
-class Task(BaseModel):
-    """任务数据模型"""
+
+# 可能命中 Markdown 语法的行首字符（数字另行判断），其余行直接视为段落
+_MARKDOWN_MARKER_CHARS = frozenset("#-*_")
+
+# 标题层级（# 的数量）对应的 block 类型
+_HEADING_BLOCK_TYPES = {1: "heading_1", 2: "heading_2", 3: "heading_3"}
+
+
+def _text_block(block_type: str, content: str) -> dict[str, Any]:
+    """构建包含纯文本内容的 Notion block
+
+    适用于 heading_1/2/3、bulleted_list_item、numbered_list_item、paragraph
+    """
+    return {
+        "object": "block",
+        "type": block_type,
+        block_type: {"rich_text": [{"type": "text", "text": {"content": content}}]},
+    }
+
+
+def _divider_block() -> dict[str, Any]:
+    """构建分隔线 block"""
+    return {"object": "block", "type": "divider", "divider": {}}
+
+
+@dataclass(slots=True, frozen=True)
+class GitCommit:
+    """Git 提交数据模型
+
+    github_client 直接构造该模型，获取到的提交无需转换即可挂到任务上；
+    数据取自 GitHub API 响应，无需 Pydantic 校验
+    """
+
+    sha: str  # 提交 SHA
+    message: str  # 提交信息
+    author: str  # 提交作者
+    date: str  # 提交日期
+    url: str  # 提交链接
+
+    def short_message(self, limit: int) -> str:
+        """返回截断后的提交信息，超过 limit 个字符时以 ... 结尾"""
+        message = self.message
+        return f"{message[:limit]}..." if len(message) > limit else message
+
+
+@dataclass(slots=True)
+class Task:
+    """任务数据模型
+
+    任务均由 Notion 页面数据提取构造，字段类型在提取时已确定，
+    使用 slots 数据类以减少实例内存占用并加快属性访问
+    """
 
     id: str
     name: str
     status: str
     description: str | None = None
-    task_type: list[str] = []
+    task_type: list[str] = field(default_factory=list)
     priority: str | None = None
     workload: str | None = None
     due_date: str | None = None
     last_edited_time: str | None = None
     # 父任务相关（通过 relation 属性）
-    parent_task_ids: list[str] = Field(default_factory=list)
+    parent_task_ids: list[str] = field(default_factory=list)
     parent_task_name: str | None = None
     # 子任务相关（通过 relation 属性）
-    sub_task_ids: list[str] = Field(default_factory=list)
+    sub_task_ids: list[str] = field(default_factory=list)
     # 子任务列表（构建层级时填充）
-    children: list["Task"] = Field(default_factory=list)
+    children: list["Task"] = field(default_factory=list)
     # Git 仓库相关
     git_repo_url: str | None = None
-    git_commits: list[GitCommit] = Field(default_factory=list)
+    git_commits: list[GitCommit] = field(default_factory=list)
+
+
+def tree_indent(level: int) -> str:
+    """获取任务树第 level 层的缩进字符串（每层两个空格）"""
+    if level < TREE_INDENT_CACHE_DEPTH:
+        return _TREE_INDENTS[level]
+    return "  " * level
+
+
+def iter_task_tree(
+    tasks: list[Task],
+    select_children: Callable[[list[Task]], list[Task]] | None = None,
+) -> Iterator[tuple[Task, int]]:
+    """先序遍历任务树，依次产出 (任务, 缩进层级)
+
+    使用显式栈迭代遍历，栈中同时记录祖先任务 ID：子任务关联成环时跳过
+    已在当前路径上的任务，同一任务挂在多个父任务下（非环）时仍会各自产出
+
+    Args:
+        tasks: 顶级任务列表
+        select_children: 可选，对每个任务的子任务做筛选或排序
+    """
+    stack = [(task, 0, frozenset()) for task in reversed(tasks)]
+    while stack:
+        task, indent, ancestors = stack.pop()
+        yield task, indent
+
+        # 逆序压栈以保持子任务的原有顺序（叶子任务直接跳过）
+        children = task.children
+        if children:
+            if select_children is not None:
+                children = select_children(children)
+            child_indent = indent + 1
+            path = ancestors | {task.id}
+            stack.extend(
+                (child, child_indent, path)
+                for child in reversed(children)
+                if child.id not in path
+            )
+
+
+def _none() -> None:
+    """属性缺失时的默认值"""
+    return None
+
+
+def _plain_text(items: list[dict[str, Any]]) -> str:
+    """拼接富文本列表中的纯文本"""
+    return "".join(t.get("plain_text", "") for t in items)
+
+
+def _extract_title(prop: dict[str, Any]) -> str:
+    return _plain_text(prop.get("title", []))
+
+
+def _extract_status(prop: dict[str, Any]) -> str:
+    return (prop.get("status") or {}).get("name", "")
+
+
+def _extract_rich_text(prop: dict[str, Any]) -> str | None:
+    return _plain_text(prop.get("rich_text", [])) or None
+
+
+def _extract_multi_select(prop: dict[str, Any]) -> list[str]:
+    return [opt.get("name", "") for opt in prop.get("multi_select", [])]
+
+
+def _extract_select(prop: dict[str, Any]) -> str | None:
+    return (prop.get("select") or {}).get("name")
+
+
+def _extract_date_start(prop: dict[str, Any]) -> str | None:
+    return (prop.get("date") or {}).get("start")
+
+
+def _extract_last_edited_time(prop: dict[str, Any]) -> str | None:
+    return prop.get("last_edited_time")
+
+
+def _extract_relation_ids(prop: dict[str, Any]) -> list[str]:
+    """从关系属性中提取相关页面 ID"""
+    # 每项只取一次 id；缺省时使用元组，避免分配空列表
+    return [rid for item in prop.get("relation", ()) if (rid := item.get("id"))]
+
+
+def _extract_url(prop: dict[str, Any]) -> str | None:
+    return prop.get("url")
+
+
+# 任务字段提取规则：(Notion 属性名, 属性类型, Task 字段名, 提取函数, 默认值工厂)
+# 属性类型不匹配或属性缺失时使用默认值
+_TASK_FIELD_SPECS: tuple[
+    tuple[str, str, str, Callable[[dict[str, Any]], Any], Callable[[], Any]], ...
+] = (
+    ("任务名称", "title", "name", _extract_title, str),
+    ("状态", "status", "status", _extract_status, str),
+    ("描述", "rich_text", "description", _extract_rich_text, _none),
+    ("任务类型", "multi_select", "task_type", _extract_multi_select, list),
+    ("优先级", "select", "priority", _extract_select, _none),
+    ("工作量等级", "select", "workload", _extract_select, _none),
+    ("截止日期", "date", "due_date", _extract_date_start, _none),
+    ("更新时间：", "last_edited_time", "last_edited_time", _extract_last_edited_time, _none),
+    # 父任务 / 子任务 ID（通过 "上级 任务" / "子级 任务" 关系属性）
+    ("上级 任务", "relation", "parent_task_ids", _extract_relation_ids, list),
+    ("子级 任务", "relation", "sub_task_ids", _extract_relation_ids, list),
+    ("Git仓库", "url", "git_repo_url", _extract_url, _none),
+)
 
 
 class NotionService:
     """Notion 服务类"""
 
+    # 并发请求 Notion API 时的最大请求数
+    MAX_CONCURRENT_REQUESTS = 8
+    # 本周任务查询结果的缓存有效期（秒）
+    WEEK_QUERY_CACHE_TTL = 300
+
     def __init__(self, settings: Settings):
-        self.client = Client(auth=settings.notion_token)
+        self._token = settings.notion_token
+        # 使用带连接池的 HTTP 客户端，整个服务生命周期内复用 keep-alive 连接
+        self._http_client = httpx.Client(limits=NOTION_HTTP_LIMITS)
+        self.client = Client(auth=self._token, client=self._http_client)
         self.task_tracker_db_id = settings.task_tracker_database_id
         self.weekly_report_db_id = settings.weekly_report_database_id
         self.include_in_progress = settings.include_in_progress
         self.include_completed = settings.include_completed
+        # 页面标题缓存，多个任务共享同一父任务时只请求一次
+        self._page_title_cache: dict[str, str | None] = {}
+        # 本周时间范围缓存：(计算当天日期, (周一, 周日, 周一 ISO, 周日 ISO))
+        self._week_bounds: (
+            tuple[date, tuple[datetime, datetime, str, str]] | None
+        ) = None
+        # 本周任务查询过滤器缓存：(缓存键, 过滤器)
+        self._week_filter_cache: (
+            tuple[tuple[str, bool, bool], dict[str, Any]] | None
+        ) = None
+        # 本周任务查询缓存：(缓存键, 缓存时间, 页面数据)
+        self._week_query_cache: (
+            tuple[tuple[str, bool, bool], float, list[dict[str, Any]]] | None
+        ) = None
+
+    def clear_cache(self) -> None:
+        """清空页面标题与本周任务查询缓存
+
+        服务跨多次生成复用时（如定时任务），每次生成前调用，
+        避免父任务改名或任务更新后仍使用旧数据
+        """
+        self._page_title_cache.clear()
+        self._week_query_cache = None
+
+    def close(self) -> None:
+        """关闭底层 HTTP 连接"""
+        self._http_client.close()
+
+    def __enter__(self) -> "NotionService":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def get_week_range(self) -> tuple[datetime, datetime]:
         """获取本周的时间范围（周一到周日）"""
-        today = datetime.now()
-        # 计算本周一
-        monday = today - timedelta(days=today.weekday())
-        monday = monday.replace(hour=0, minute=0, second=0, microsecond=0)
-        # 计算本周日
-        sunday = monday + timedelta(days=6, hours=23, minutes=59, seconds=59)
+        monday, sunday, _, _ = self._get_week_bounds()
         return monday, sunday
 
-    def _extract_relation_ids(self, relation_prop: dict[str, Any]) -> list[str]:
-        """从关系属性中提取相关页面 ID"""
-        if relation_prop.get("type") != "relation":
-            return []
+    def _get_week_bounds(self) -> tuple[datetime, datetime, str, str]:
+        """获取本周时间范围及其 ISO 字符串
 
-        relation_list = relation_prop.get("relation", [])
-        return [item.get("id", "") for item in relation_list if item.get("id")]
+        结果按当天日期缓存，跨天（如调度器长期运行）时自动重新计算
+
+        Returns:
+            (本周一, 本周日, 本周一 ISO 字符串, 本周日 ISO 字符串)
+        """
+        today = date.today()
+        if self._week_bounds is None or self._week_bounds[0] != today:
+            # 计算本周一
+            monday = datetime.combine(
+                today - timedelta(days=today.weekday()), datetime.min.time()
+            )
+            # 计算本周日
+            sunday = monday + timedelta(days=6, hours=23, minutes=59, seconds=59)
+            self._week_bounds = (
+                today,
+                (monday, sunday, monday.isoformat(), sunday.isoformat()),
+            )
+        return self._week_bounds[1]
 
     def _extract_task_from_page(self, page: dict[str, Any]) -> Task:
         """从 Notion 页面数据中提取任务信息"""
         properties = page.get("properties", {})
 
-        # 提取任务名称
-        name_prop = properties.get("任务名称", {})
-        name = ""
-        if name_prop.get("type") == "title":
-            title_list = name_prop.get("title", [])
-            name = "".join(t.get("plain_text", "") for t in title_list)
-
-        # 提取状态
-        status_prop = properties.get("状态", {})
-        status = ""
-        if status_prop.get("type") == "status":
-            status_obj = status_prop.get("status")
-            if status_obj:
-                status = status_obj.get("name", "")
-
-        # 提取描述
-        desc_prop = properties.get("描述", {})
-        description = None
-        if desc_prop.get("type") == "rich_text":
-            rich_text_list = desc_prop.get("rich_text", [])
-            description = (
-                "".join(t.get("plain_text", "") for t in rich_text_list) or None
+        fields: dict[str, Any] = {"id": page.get("id", "")}
+        for prop_name, prop_type, field_name, extract, default in _TASK_FIELD_SPECS:
+            prop = properties.get(prop_name, {})
+            if prop.get("type") == prop_type:
+                fields[field_name] = extract(prop)
+            else:
+                fields[field_name] = default()
+
+        return Task(**fields)
+
+    def _get_page_titles(self, page_ids: Iterable[str]) -> dict[str, str | None]:
+        """批量获取页面标题（结果按页面 ID 缓存，未缓存的页面并发请求）"""
+        page_ids = list(dict.fromkeys(page_ids))
+        missing_ids = [pid for pid in page_ids if pid not in self._page_title_cache]
+        if missing_ids:
+            asyncio.run(self._fetch_page_titles(missing_ids))
+        return {pid: self._page_title_cache.get(pid) for pid in page_ids}
+
+    async def _fetch_page_titles(self, page_ids: list[str]) -> None:
+        """并发请求页面并将标题写入缓存"""
+        # 限制并发数，避免触发 Notion API 的速率限制
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        # 异步连接绑定在当前事件循环上，因此每批请求使用独立的连接池
+        async with httpx.AsyncClient(limits=NOTION_HTTP_LIMITS) as http_client:
+            client = AsyncClient(auth=self._token, client=http_client)
+
+            async def retrieve(page_id: str) -> dict[str, Any]:
+                async with semaphore:
+                    return await client.pages.retrieve(page_id=page_id)
+
+            pages = await asyncio.gather(
+                *(retrieve(pid) for pid in page_ids),
+                return_exceptions=True,
             )
 
-        # 提取任务类型
-        type_prop = properties.get("任务类型", {})
-        task_type = []
-        if type_prop.get("type") == "multi_select":
-            task_type = [
-                opt.get("name", "") for opt in type_prop.get("multi_select", [])
-            ]
+        for page_id, page in zip(page_ids, pages):
+            # 请求失败不缓存，下次调用时重试
+            if isinstance(page, Exception):
+                continue
+            self._page_title_cache[page_id] = self._extract_page_title(page)
 
-        # 提取优先级
-        priority_prop = properties.get("优先级", {})
-        priority = None
-        if priority_prop.get("type") == "select":
-            select_obj = priority_prop.get("select")
-            if select_obj:
-                priority = select_obj.get("name")
-
-        # 提取工作量等级
-        workload_prop = properties.get("工作量等级", {})
-        workload = None
-        if workload_prop.get("type") == "select":
-            select_obj = workload_prop.get("select")
-            if select_obj:
-                workload = select_obj.get("name")
-
-        # 提取截止日期
-        due_prop = properties.get("截止日期", {})
-        due_date = None
-        if due_prop.get("type") == "date":
-            date_obj = due_prop.get("date")
-            if date_obj:
-                due_date = date_obj.get("start")
-
-        # 提取更新时间
-        last_edited = properties.get("更新时间：", {})
-        last_edited_time = None
-        if last_edited.get("type") == "last_edited_time":
-            last_edited_time = last_edited.get("last_edited_time")
-
-        # 提取父任务 ID（通过 "上级 任务" 关系属性）
-        parent_prop = properties.get("上级 任务", {})
-        parent_task_ids = self._extract_relation_ids(parent_prop)
-
-        # 提取子任务 ID（通过 "子级 任务" 关系属性）
-        sub_prop = properties.get("子级 任务", {})
-        sub_task_ids = self._extract_relation_ids(sub_prop)
-
-        # 提取 Git 仓库 URL
-        git_prop = properties.get("Git仓库", {})
-        git_repo_url = None
-        if git_prop.get("type") == "url":
-            git_repo_url = git_prop.get("url")
-
-        return Task(
-            id=page.get("id", ""),
-            name=name,
-            status=status,
-            description=description,
-            task_type=task_type,
-            priority=priority,
-            workload=workload,
-            due_date=due_date,
-            last_edited_time=last_edited_time,
-            parent_task_ids=parent_task_ids,
-            sub_task_ids=sub_task_ids,
-            git_repo_url=git_repo_url,
-        )
+    def _link_parent_task(
+        self,
+        task: Task,
+        task_map: dict[str, Task],
+        pending: list[tuple[Task, str]],
+    ) -> None:
+        """填充父任务名称；父任务不在本周列表中时记入 pending 稍后批量获取"""
+        if task.parent_task_ids:
+            parent_id = task.parent_task_ids[0]  # 取第一个父任务
+            parent = task_map.get(parent_id)
+            if parent is not None:
+                task.parent_task_name = parent.name
+            else:
+                pending.append((task, parent_id))
+
+    def _resolve_pending_parent_names(self, pending: list[tuple[Task, str]]) -> None:
+        """批量获取不在本周列表中的父任务名称"""
+        if not pending:
+            return
+
+        titles = self._get_page_titles(parent_id for _, parent_id in pending)
+        for task, parent_id in pending:
+            task.parent_task_name = titles.get(parent_id)
+
+    def _fill_parent_task_names(
+        self, tasks: list[Task], task_map: dict[str, Task]
+    ) -> None:
+        """填充父任务名称"""
+        pending: list[tuple[Task, str]] = []
+        for task in tasks:
+            self._link_parent_task(task, task_map, pending)
+        self._resolve_pending_parent_names(pending)
 
-    def _get_page_title(self, page_id: str) -> str | None:
-        """获取页面标题"""
-        try:
-            page = self.client.pages.retrieve(page_id=page_id)
-            properties = page.get("properties", {})
+    def _extract_page_title(self, page: dict[str, Any]) -> str | None:
+        """从页面数据中提取标题"""
+        properties = page.get("properties", {})
 
-            # 尝试多种可能的标题属性名
-            for title_key in ["任务名称", "Name", "title", "名称"]:
-                title_prop = properties.get(title_key, {})
-                if title_prop.get("type") == "title":
-                    title_list = title_prop.get("title", [])
-                    return "".join(t.get("plain_text", "") for t in title_list)
+        # 尝试多种可能的标题属性名
+        for title_key in ["任务名称", "Name", "title", "名称"]:
+            title_prop = properties.get(title_key, {})
+            if title_prop.get("type") == "title":
+                title_list = title_prop.get("title", [])
+                return "".join(t.get("plain_text", "") for t in title_list)
 
-            return None
-        except Exception:
-            return None
+        return None
 
     def _build_task_hierarchy(self, tasks: list[Task]) -> list[Task]:
         """构建任务层级关系（基于 relation 属性）
@@ -192,45 +393,62 @@ class NotionService:
         # 创建任务 ID 到任务的映射
         task_map: dict[str, Task] = {task.id: task for task in tasks}
 
-        # 第一步：填充父任务名称
-        for task in tasks:
-            if task.parent_task_ids:
-                parent_id = task.parent_task_ids[0]  # 取第一个父任务
-                if parent_id in task_map:
-                    task.parent_task_name = task_map[parent_id].name
-                else:
-                    # 父任务不在本周列表中，尝试获取名称
-                    task.parent_task_name = self._get_page_title(parent_id)
-
-        # 第二步：构建子任务关系
-        for task in tasks:
-            # 将子任务添加到对应的父任务 children 中
-            for sub_id in task.sub_task_ids:
-                if sub_id in task_map:
-                    child_task = task_map[sub_id]
-                    if child_task not in task.children:
-                        task.children.append(child_task)
-
-        # 第三步：找出顶级任务（没有父任务在列表中的任务）
-        root_tasks: list[Task] = []
+        # 单次遍历：填充父任务名称、构建子任务关系并收集所有被标记为子任务的 ID
+        pending: list[tuple[Task, str]] = []
         child_ids: set[str] = set()
-
-        # 收集所有被标记为子任务的 ID
         for task in tasks:
+            self._link_parent_task(task, task_map, pending)
+
+            # 将子任务添加到对应的父任务 children 中；sub_task_ids 中重复的 ID
+            # 用集合记录已添加的子任务 ID 来跳过，无需在 children 列表中查找
+            seen: set[str] = set()
             for sub_id in task.sub_task_ids:
-                if sub_id in task_map:
+                if sub_id in task_map and sub_id not in seen:
+                    seen.add(sub_id)
                     child_ids.add(sub_id)
+                    task.children.append(task_map[sub_id])
+
+        # 父任务不在本周列表中的，批量获取名称
+        self._resolve_pending_parent_names(pending)
 
         # 顶级任务：不在任何任务的子任务列表中
-        for task in tasks:
-            if task.id not in child_ids:
-                root_tasks.append(task)
+        return [task for task in tasks if task.id not in child_ids]
 
-        return root_tasks
+    def _query_week(self) -> list[dict[str, Any]]:
+        """查询本周任务页面原始数据
 
-    def get_weekly_tasks(self) -> list[Task]:
-        """获取本周的任务列表（包含层级关系）"""
-        monday, sunday = self.get_week_range()
+        结果按 (本周一, 状态过滤开关) 缓存 WEEK_QUERY_CACHE_TTL 秒，
+        同一次运行中先后获取层级与扁平任务时不会重复请求
+        """
+        query_filter = self._build_week_filter()
+        if query_filter is None:
+            return []
+
+        monday_iso = self._get_week_bounds()[2]
+        cache_key = (monday_iso, self.include_in_progress, self.include_completed)
+        if self._week_query_cache is not None:
+            cached_key, cached_at, cached_pages = self._week_query_cache
+            if (
+                cached_key == cache_key
+                and time.monotonic() - cached_at < self.WEEK_QUERY_CACHE_TTL
+            ):
+                return cached_pages
+
+        pages = list(self._iter_week_pages(query_filter))
+        self._week_query_cache = (cache_key, time.monotonic(), pages)
+        return pages
+
+    def _build_week_filter(self) -> dict[str, Any] | None:
+        """构建本周任务查询过滤器
+
+        结果按 (本周一, 状态过滤开关) 缓存；未启用任何状态时返回 None，无需查询
+        """
+        _, _, monday_iso, sunday_iso = self._get_week_bounds()
+        cache_key = (monday_iso, self.include_in_progress, self.include_completed)
+        if self._week_filter_cache is not None:
+            cached_key, cached_filter = self._week_filter_cache
+            if cached_key == cache_key:
+                return cached_filter
 
         # 构建状态过滤条件
         status_filters = []
@@ -250,30 +468,40 @@ class NotionService:
             )
 
         if not status_filters:
-            return []
+            return None
 
         # 构建查询过滤器
         # 筛选条件：状态为进行中或已完成，且更新时间在本周内
-        query_filter = {
+        query_filter: dict[str, Any] = {
             "and": [
                 {"or": status_filters},
                 {
                     "property": "更新时间：",
                     "last_edited_time": {
-                        "on_or_after": monday.isoformat(),
+                        "on_or_after": monday_iso,
                     },
                 },
                 {
                     "property": "更新时间：",
                     "last_edited_time": {
-                        "on_or_before": sunday.isoformat(),
+                        "on_or_before": sunday_iso,
                     },
                 },
             ]
         }
+        self._week_filter_cache = (cache_key, query_filter)
+        return query_filter
+
+    def _iter_week_pages(
+        self, query_filter: dict[str, Any]
+    ) -> Iterator[dict[str, Any]]:
+        """逐页请求 Notion，依次产出本周任务页面
 
-        # 查询数据库（使用 data_sources.query API）
-        results = self.client.data_sources.query(
+        单次查询最多返回 100 条结果，通过 start_cursor 翻页获取全部结果
+        """
+        # 查询数据库（使用 data_sources.query API，自动翻页）
+        yield from iterate_paginated_api(
+            self.client.data_sources.query,
             data_source_id=self.task_tracker_db_id,
             filter=query_filter,
             sorts=[
@@ -282,10 +510,13 @@ class NotionService:
                     "direction": "descending",
                 }
             ],
+            page_size=100,
         )
 
-        tasks = []
-        for page in results.get("results", []):
+    def get_weekly_tasks(self) -> list[Task]:
+        """获取本周的任务列表（包含层级关系）"""
+        tasks: list[Task] = []
+        for page in self._query_week():
             task = self._extract_task_from_page(page)
             if task.name:  # 只添加有名称的任务
                 tasks.append(task)
@@ -295,78 +526,50 @@ class NotionService:
 
     def get_weekly_tasks_flat(self) -> list[Task]:
         """获取本周的任务列表（扁平结构，包含父任务名称）"""
-        monday, sunday = self.get_week_range()
-
-        # 构建状态过滤条件
-        status_filters = []
-        if self.include_in_progress:
-            status_filters.append(
-                {
-                    "property": "状态",
-                    "status": {"equals": "进行中"},
-                }
-            )
-        if self.include_completed:
-            status_filters.append(
-                {
-                    "property": "状态",
-                    "status": {"equals": "已完成"},
-                }
-            )
-
-        if not status_filters:
-            return []
-
-        query_filter = {
-            "and": [
-                {"or": status_filters},
-                {
-                    "property": "更新时间：",
-                    "last_edited_time": {
-                        "on_or_after": monday.isoformat(),
-                    },
-                },
-                {
-                    "property": "更新时间：",
-                    "last_edited_time": {
-                        "on_or_before": sunday.isoformat(),
-                    },
-                },
-            ]
-        }
-
-        results = self.client.data_sources.query(
-            data_source_id=self.task_tracker_db_id,
-            filter=query_filter,
-            sorts=[
-                {
-                    "property": "更新时间：",
-                    "direction": "descending",
-                }
-            ],
-        )
-
-        tasks = []
+        tasks: list[Task] = []
         task_map: dict[str, Task] = {}
 
         # 第一遍：提取所有任务
-        for page in results.get("results", []):
+        for page in self._query_week():
             task = self._extract_task_from_page(page)
             if task.name:
                 tasks.append(task)
                 task_map[task.id] = task
 
         # 第二遍：填充父任务名称
-        for task in tasks:
-            if task.parent_task_ids:
-                parent_id = task.parent_task_ids[0]
-                if parent_id in task_map:
-                    task.parent_task_name = task_map[parent_id].name
-                else:
-                    task.parent_task_name = self._get_page_title(parent_id)
+        self._fill_parent_task_names(tasks, task_map)
 
         return tasks
 
+    def _report_page_properties(
+        self, title: str, start_date: datetime, end_date: datetime
+    ) -> dict[str, Any]:
+        """构建周报页面的属性（标题与日期）"""
+        return {
+            "名称": {
+                "title": [
+                    {
+                        "text": {"content": title},
+                    }
+                ]
+            },
+            "日期": {
+                "date": {
+                    "start": start_date.strftime("%Y-%m-%d"),
+                    "end": end_date.strftime("%Y-%m-%d"),
+                }
+            },
+        }
+
+    def _append_blocks(self, page_id: str, blocks: list[dict[str, Any]]) -> None:
+        """按单次请求上限分批追加 blocks 到页面末尾（顺序追加以保持内容顺序）"""
+        batch_size = NOTION_MAX_CHILDREN_PER_REQUEST
+        for start in range(0, len(blocks), batch_size):
+            self.client.blocks.children.append(
+                block_id=page_id,
+                children=blocks[start : start + batch_size],
+            )
+
     def create_weekly_report(
         self,
         title: str,
@@ -375,133 +578,75 @@ class NotionService:
         end_date: datetime,
     ) -> dict[str, Any]:
         """创建周报页面"""
-        # 创建页面
+        blocks = self._markdown_to_blocks(content)
+
+        # 创建页面（附带第一批 blocks）
         new_page = self.client.pages.create(
             parent={"database_id": self.weekly_report_db_id},
-            properties={
-                "名称": {
-                    "title": [
-                        {
-                            "text": {"content": title},
-                        }
-                    ]
-                },
-                "日期": {
-                    "date": {
-                        "start": start_date.strftime("%Y-%m-%d"),
-                        "end": end_date.strftime("%Y-%m-%d"),
-                    }
-                },
-            },
-            children=self._markdown_to_blocks(content),
+            properties=self._report_page_properties(title, start_date, end_date),
+            children=blocks[:NOTION_MAX_CHILDREN_PER_REQUEST],
         )
 
+        # 超出单次请求上限的 blocks 分批追加到页面末尾
+        self._append_blocks(new_page["id"], blocks[NOTION_MAX_CHILDREN_PER_REQUEST:])
+
         return new_page
 
+    def create_report_page(
+        self, title: str, start_date: datetime, end_date: datetime
+    ) -> dict[str, Any]:
+        """创建不含内容的周报页面，内容稍后通过 append_report_content 追加
+
+        页面框架不依赖周报内容，可与周报生成并发创建。
+        """
+        return self.client.pages.create(
+            parent={"database_id": self.weekly_report_db_id},
+            properties=self._report_page_properties(title, start_date, end_date),
+        )
+
+    def append_report_content(self, page_id: str, content: str) -> None:
+        """将 Markdown 周报内容追加到已创建的页面"""
+        self._append_blocks(page_id, self._markdown_to_blocks(content))
+
+    def trash_page(self, page_id: str) -> None:
+        """将页面移入回收站"""
+        self.client.pages.update(page_id=page_id, in_trash=True)
+
     def _markdown_to_blocks(self, markdown_content: str) -> list[dict[str, Any]]:
         """将 Markdown 内容转换为 Notion blocks"""
-        blocks = []
-        lines = markdown_content.split("\n")
-
-        i = 0
-        while i < len(lines):
-            line = lines[i]
+        blocks: list[dict[str, Any]] = []
+        for line in markdown_content.splitlines():
+            stripped = line.strip()
 
             # 跳过空行
-            if not line.strip():
-                i += 1
+            if not stripped:
                 continue
 
-            # 处理标题
-            if line.startswith("### "):
-                blocks.append(
-                    {
-                        "object": "block",
-                        "type": "heading_3",
-                        "heading_3": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": line[4:].strip()}}
-                            ]
-                        },
-                    }
-                )
-            elif line.startswith("## "):
-                blocks.append(
-                    {
-                        "object": "block",
-                        "type": "heading_2",
-                        "heading_2": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": line[3:].strip()}}
-                            ]
-                        },
-                    }
-                )
-            elif line.startswith("# "):
-                blocks.append(
-                    {
-                        "object": "block",
-                        "type": "heading_1",
-                        "heading_1": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": line[2:].strip()}}
-                            ]
-                        },
-                    }
-                )
-            # 处理无序列表
-            elif line.strip().startswith("- ") or line.strip().startswith("* "):
-                content = line.strip()[2:].strip()
-                blocks.append(
-                    {
-                        "object": "block",
-                        "type": "bulleted_list_item",
-                        "bulleted_list_item": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": content}}
-                            ]
-                        },
-                    }
-                )
-            # 处理有序列表
-            elif line.strip() and line.strip()[0].isdigit() and ". " in line:
-                content = (
-                    line.strip().split(". ", 1)[1] if ". " in line else line.strip()
-                )
-                blocks.append(
-                    {
-                        "object": "block",
-                        "type": "numbered_list_item",
-                        "numbered_list_item": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": content}}
-                            ]
-                        },
-                    }
-                )
-            # 处理分隔线
-            elif line.strip() in ("---", "***", "___"):
-                blocks.append(
-                    {
-                        "object": "block",
-                        "type": "divider",
-                        "divider": {},
-                    }
-                )
-            # 普通段落
+            # 行首字符不可能构成 Markdown 语法时跳过正则匹配
+            first_char = stripped[0]
+            if first_char in _MARKDOWN_MARKER_CHARS or first_char.isdecimal():
+                match = _MARKDOWN_LINE_PATTERN.fullmatch(stripped)
             else:
+                match = None
+
+            if match is None:
+                # 普通段落
+                blocks.append(_text_block("paragraph", stripped))
+            elif match["heading"]:
+                # 处理标题
+                block_type = _HEADING_BLOCK_TYPES[len(match["heading"])]
+                # 行尾空白已去除，只需去掉标记后的前导空白
+                blocks.append(_text_block(block_type, match["heading_text"].lstrip()))
+            elif match["bullet"] is not None:
+                # 处理无序列表
                 blocks.append(
-                    {
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": line.strip()}}
-                            ]
-                        },
-                    }
+                    _text_block("bulleted_list_item", match["bullet"].lstrip())
                 )
-
-            i += 1
+            elif match["numbered"] is not None:
+                # 处理有序列表
+                blocks.append(_text_block("numbered_list_item", match["numbered"]))
+            else:
+                # 处理分隔线
+                blocks.append(_divider_block())
 
         return blocks
@@ -1,66 +1,183 @@
 """周报生成器模块"""
 
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
+from typing import Any
 
 from .config import Settings, get_settings
-from .notion_client import NotionService, Task
+from .notion_client import (
+    GitCommit,
+    NotionService,
+    Task,
+    iter_task_tree,
+    tree_indent,
+)
 from .deepseek_client import DeepSeekService
 from .github_client import GitHubService
 
 
-def _count_all_tasks(tasks: list[Task]) -> tuple[int, int, int]:
-    """递归统计所有任务数量（包括子任务）
+# 本周任务与 Git 提交的磁盘缓存目录及有效期（秒）
+FETCH_CACHE_DIR = Path(".cache") / "notion_week_report"
+FETCH_CACHE_TTL = 3600
 
-    Returns:
-        (总数, 已完成数, 进行中数)
-    """
-    total = 0
-    completed = 0
-    in_progress = 0
-
-    for task in tasks:
-        total += 1
-        if task.status == "已完成":
-            completed += 1
-        elif task.status == "进行中":
-            in_progress += 1
+# 任务状态对应的展示图标（未列出的状态显示为进行中图标）
+_STATUS_EMOJI = {"已完成": "✅", "进行中": "🔄"}
 
-        # 递归统计子任务
-        sub_total, sub_completed, sub_in_progress = _count_all_tasks(task.children)
-        total += sub_total
-        completed += sub_completed
-        in_progress += sub_in_progress
 
-    return total, completed, in_progress
+# 缓存中按原样保存的 Task 字段（children 改存子任务 ID，git_commits 另行缓存）
+_TASK_CACHE_FIELDS = tuple(
+    f.name for f in fields(Task) if f.name not in ("children", "git_commits")
+)
 
 
-def _print_task_tree(task: Task, indent: int = 0):
-    """递归打印任务树"""
-    prefix = "   " + "  " * indent
-    status_emoji = "✅" if task.status == "已完成" else "🔄"
+def _fetch_cache_path(
+    source: str, week_start: datetime, week_end: datetime, *parts: object
+) -> Path:
+    """获取指定数据来源与周期的磁盘缓存路径
 
-    # 打印任务名称
+    Args:
+        source: 数据来源（tasks / commits）
+        week_start: 本周开始时间
+        week_end: 本周结束时间
+        *parts: 影响查询结果的其他参数（如数据库 ID、状态筛选），一并写入文件名
+    """
+    name = "-".join([source, *(str(part) for part in parts)])
+    return FETCH_CACHE_DIR / f"{name}-{week_start:%Y%m%d}-{week_end:%Y%m%d}.json"
+
+
+def _load_fetch_cache(path: Path) -> Any | None:
+    """读取未过期的磁盘缓存，不存在、已过期或无法读取时返回 None"""
+    try:
+        if time.time() - path.stat().st_mtime > FETCH_CACHE_TTL:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        # 缓存仅用于加速，文件损坏或数据模型变更时直接重新获取
+        return None
+
+
+def _save_fetch_cache(path: Path, data: Any) -> None:
+    """写入磁盘缓存，先写临时文件再替换，避免读到写了一半的文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _dump_tasks(tasks: list[Task]) -> dict[str, Any]:
+    """将任务树展开为按 ID 索引的字典，子任务只记录 ID（可容纳共享子任务与环）"""
+    flat: dict[str, dict[str, Any]] = {}
+    stack = list(tasks)
+    while stack:
+        task = stack.pop()
+        if task.id in flat:
+            continue
+        data = {name: getattr(task, name) for name in _TASK_CACHE_FIELDS}
+        data["children"] = [child.id for child in task.children]
+        flat[task.id] = data
+        stack.extend(task.children)
+    return {"roots": [task.id for task in tasks], "tasks": flat}
+
+
+def _load_tasks(data: dict[str, Any]) -> list[Task]:
+    """从 _dump_tasks 的结果重建任务树"""
+    flat = data["tasks"]
+    tasks = {
+        task_id: Task(**{name: item[name] for name in _TASK_CACHE_FIELDS})
+        for task_id, item in flat.items()
+    }
+    for task_id, task in tasks.items():
+        task.children = [tasks[child_id] for child_id in flat[task_id]["children"]]
+    return [tasks[task_id] for task_id in data["roots"]]
+
+
+def _dump_commits(commits: list[GitCommit]) -> list[dict[str, Any]]:
+    """将 GitCommit 列表转换为可 JSON 序列化的字典列表"""
+    return [asdict(commit) for commit in commits]
+
+
+def _load_commits(items: list[dict[str, Any]]) -> list[GitCommit]:
+    """从 _dump_commits 的结果重建 GitCommit 列表"""
+    return [GitCommit(**item) for item in items]
+
+
+@dataclass(slots=True)
+class _TaskTreeScan:
+    """任务树单次遍历的结果"""
+
+    total: int = 0
+    completed: int = 0
+    in_progress: int = 0
+    # 与 nodes 一一对应的任务状态，计数时交给 list.count 在 C 层完成
+    statuses: list[str] = field(default_factory=list)
+    # 先序遍历顺序的 (任务, 缩进层级)，用于打印任务列表
+    nodes: list[tuple[Task, int]] = field(default_factory=list)
+    # 带 Git 仓库的任务（先序遍历顺序），用于获取提交历史
+    repo_tasks: list[Task] = field(default_factory=list)
+
+
+def _scan_task_tree(tasks: list[Task]) -> _TaskTreeScan:
+    """迭代遍历一次任务树，同时完成计数、收集打印节点和 Git 仓库任务"""
+    scan = _TaskTreeScan()
+    statuses = scan.statuses
+    nodes = scan.nodes
+    repo_tasks = scan.repo_tasks
+
+    for task, indent in iter_task_tree(tasks):
+        statuses.append(task.status)
+        nodes.append((task, indent))
+        if task.git_repo_url:
+            repo_tasks.append(task)
+
+    scan.total = len(statuses)
+    scan.completed = statuses.count("已完成")
+    scan.in_progress = statuses.count("进行中")
+    return scan
+
+
+def _format_task_node(task: Task, indent: int, out: list[str]) -> None:
+    """将单个任务（不含子任务）及其 Git 提交信息格式化后追加到 out"""
+    indent_str = tree_indent(indent)
+    prefix = f"   {indent_str}"
+    git_prefix = f"      {indent_str}"
+    status = task.status
+    status_emoji = _STATUS_EMOJI.get(status, "🔄")
+
+    # 任务名称
     if task.parent_task_name and indent == 0:
-        print(f"{prefix}{status_emoji} [{task.parent_task_name}] {task.name} [{task.status}]")
+        out.append(
+            f"{prefix}{status_emoji} [{task.parent_task_name}] {task.name} [{status}]"
+        )
     else:
-        print(f"{prefix}{status_emoji} {task.name} [{task.status}]")
-
-    # 打印 Git 仓库和提交信息
-    if task.git_repo_url:
-        git_prefix = prefix + "   "
-        print(f"{git_prefix}🔗 Git: {task.git_repo_url}")
-        if task.git_commits:
-            print(f"{git_prefix}📝 本周 {len(task.git_commits)} 条提交:")
-            for commit in task.git_commits[:5]:  # 预览最多显示 5 条
-                msg = commit.message[:40] + "..." if len(commit.message) > 40 else commit.message
-                print(f"{git_prefix}   · {commit.sha}: {msg}")
-            if len(task.git_commits) > 5:
-                print(f"{git_prefix}   ... 还有 {len(task.git_commits) - 5} 条提交")
-
-    # 递归打印子任务
-    for child in task.children:
-        _print_task_tree(child, indent + 1)
+        out.append(f"{prefix}{status_emoji} {task.name} [{status}]")
+
+    # Git 仓库和提交信息
+    repo_url = task.git_repo_url
+    if repo_url:
+        out.append(f"{git_prefix}🔗 Git: {repo_url}")
+        commits = task.git_commits
+        if commits:
+            commit_count = len(commits)
+            out.append(f"{git_prefix}📝 本周 {commit_count} 条提交:")
+            # 预览最多显示 5 条，提交行前缀只拼接一次
+            commit_prefix = f"{git_prefix}   · "
+            out.extend(
+                f"{commit_prefix}{commit.sha}: {commit.short_message(40)}"
+                for commit in commits[:5]
+            )
+            if commit_count > 5:
+                out.append(f"{git_prefix}   ... 还有 {commit_count - 5} 条提交")
 
 
 class WeeklyReportGenerator:
@@ -72,104 +189,285 @@ class WeeklyReportGenerator:
         if settings is None:
             settings = get_settings(config_path)
         self.settings = settings
-        self.notion_service = NotionService(self.settings)
-        self.deepseek_service = DeepSeekService(self.settings)
-        # 初始化 GitHub 服务（如果启用）
-        self.github_service = None
-        if self.settings.github_enabled:
-            self.github_service = GitHubService(token=self.settings.github_token)
+        # 日志缓冲区，按阶段统一写出，减少频繁的小量写入
+        self._log = io.StringIO()
 
-    def _fetch_git_commits_for_tasks(
+    # 各服务在首次访问时创建，未用到的服务不会建立 HTTP 客户端
+    @cached_property
+    def notion_service(self) -> NotionService:
+        return NotionService(self.settings)
+
+    @cached_property
+    def deepseek_service(self) -> DeepSeekService:
+        return DeepSeekService(self.settings)
+
+    @cached_property
+    def github_service(self) -> GitHubService | None:
+        # 初始化 GitHub 服务（如果启用）
+        if not self.settings.github_enabled:
+            return None
+        return GitHubService(token=self.settings.github_token)
+
+    def _clear_run_caches(self) -> None:
+        """清空仅在单次生成内有效的缓存
+
+        生成器会被定时任务跨周复用，标题、查询结果与提交历史都可能已变化；
+        需要跨次复用时应开启磁盘缓存（enable_fetch_cache）
+        """
+        for name in ("notion_service", "github_service"):
+            # 未创建的服务没有缓存，无需为此创建
+            service = self.__dict__.get(name)
+            if service is not None:
+                service.clear_cache()
+
+    def close(self) -> None:
+        """关闭已创建服务的底层 HTTP 连接"""
+        # DeepSeek 客户端在每次生成时创建并关闭，无需在此处理
+        for name in ("notion_service", "github_service"):
+            # cached_property 的结果存放在实例字典中，未访问过的服务无需关闭
+            service = self.__dict__.get(name)
+            if service is not None:
+                service.close()
+
+    def _log_line(self, line: str = "") -> None:
+        """写入一行日志到缓冲区，由 _flush_log 按阶段统一输出"""
+        self._log_lines((line,))
+
+    def _log_lines(self, lines: Iterable[str]) -> None:
+        """写入多行日志到缓冲区（所有日志都经由此处写入）"""
+        log = self._log
+        for line in lines:
+            log.write(line)
+            log.write("\n")
+
+    def _flush_log(self) -> None:
+        """将缓冲的日志一次写出到标准输出并清空缓冲区"""
+        content = self._log.getvalue()
+        if content:
+            sys.stdout.write(content)
+            sys.stdout.flush()
+            self._log = io.StringIO()
+
+    async def _afetch_git_commits_for_tasks(
         self,
-        tasks: list[Task],
+        repo_tasks: list[Task],
         week_start: datetime,
         week_end: datetime,
     ) -> None:
-        """为任务列表获取 Git 提交历史（递归处理子任务）"""
-        if not self.github_service:
+        """为带 Git 仓库的任务获取提交历史（各仓库并发请求）
+
+        Args:
+            repo_tasks: 带 git_repo_url 的任务列表（已由 _scan_task_tree 收集）
+            week_start: 本周开始时间
+            week_end: 本周结束时间
+        """
+        if not self.github_service or not repo_tasks:
             return
 
-        for task in tasks:
-            if task.git_repo_url:
-                commits = self.github_service.get_weekly_commits(
-                    repo_url=task.git_repo_url,
+        github_service = self.github_service
+        # 仓库 URL 到本周提交的映射，启用磁盘缓存时先载入未过期的缓存
+        commits_by_url: dict[str, list[GitCommit]] = {}
+
+        disk_cache_path = None
+        if self.settings.enable_fetch_cache:
+            disk_cache_path = _fetch_cache_path("commits", week_start, week_end)
+            cached_commits = _load_fetch_cache(disk_cache_path) or {}
+            try:
+                for url, items in cached_commits.items():
+                    commits_by_url[url] = _load_commits(items)
+            except (AttributeError, TypeError):
+                # 缓存格式不符时忽略，重新获取
+                commits_by_url.clear()
+
+        # 跳过磁盘缓存中已有的仓库，其余交给批量接口（内部按 URL 去重）
+        missing_urls = [
+            task.git_repo_url
+            for task in repo_tasks
+            if task.git_repo_url not in commits_by_url
+        ]
+
+        if missing_urls:
+            try:
+                fetched = await github_service.aget_weekly_commits_batch(
+                    missing_urls,
                     week_start=week_start,
                     week_end=week_end,
                 )
-                # 将 GitCommit 转换为 notion_client 中的 GitCommit 模型
-                from .notion_client import GitCommit as TaskGitCommit
-
-                task.git_commits = [
-                    TaskGitCommit(
-                        sha=c.sha,
-                        message=c.message,
-                        author=c.author,
-                        date=c.date,
-                        url=c.url,
-                    )
-                    for c in commits
-                ]
-                if commits:
-                    print(f"   📦 {task.name}: 获取到 {len(commits)} 条提交")
+            finally:
+                # 异步连接绑定当前事件循环，用完即关闭
+                await github_service.aclose()
+
+            for url, commits in fetched.items():
+                # 请求失败时为 None，不缓存，以便下次重试；本周无提交同样缓存
+                if commits is not None:
+                    commits_by_url[url] = commits
+
+            if disk_cache_path is not None:
+                self._write_fetch_cache(
+                    disk_cache_path,
+                    {
+                        url: _dump_commits(commits)
+                        for url, commits in commits_by_url.items()
+                    },
+                )
 
-            # 递归处理子任务
-            if task.children:
-                self._fetch_git_commits_for_tasks(task.children, week_start, week_end)
+        log_line = self._log_line
+        for task in repo_tasks:
+            commits = commits_by_url.get(task.git_repo_url, [])
+            # GitCommit 不可变，共享仓库的任务只需复制列表
+            task.git_commits = list(commits)
+            if commits:
+                log_line(f"   📦 {task.name}: 获取到 {len(commits)} 条提交")
+
+    def _write_fetch_cache(self, path: Path, data: Any) -> None:
+        """写入磁盘缓存，失败时只记录警告"""
+        try:
+            _save_fetch_cache(path, data)
+        except OSError as e:
+            self._log_line(f"   ⚠️ 写入缓存失败: {e}")
+
+    def _get_weekly_tasks(
+        self, week_start: datetime, week_end: datetime
+    ) -> list[Task]:
+        """获取本周任务，启用磁盘缓存时优先使用未过期的缓存"""
+        if not self.settings.enable_fetch_cache:
+            return self.notion_service.get_weekly_tasks()
+
+        settings = self.settings
+        # 数据库与状态筛选不同，查询结果也不同，需写入文件名区分
+        cache_path = _fetch_cache_path(
+            "tasks",
+            week_start,
+            week_end,
+            settings.task_tracker_database_id,
+            int(settings.include_in_progress),
+            int(settings.include_completed),
+        )
+        cached = _load_fetch_cache(cache_path)
+        if cached is not None:
+            try:
+                tasks = _load_tasks(cached)
+            except (KeyError, TypeError):
+                # 缓存格式不符时忽略，重新获取
+                pass
+            else:
+                self._log_line("   使用磁盘缓存的任务数据")
+                return tasks
 
-    def generate_and_publish(self) -> dict:
-        """生成并发布周报"""
-        print("🚀 开始生成周报...")
+        tasks = self.notion_service.get_weekly_tasks()
+        # 在挂载 Git 提交之前写入，提交另行缓存
+        self._write_fetch_cache(cache_path, _dump_tasks(tasks))
+        return tasks
+
+    async def _discard_report_page(self, page_future: asyncio.Future) -> None:
+        """周报生成失败时，将已预先创建的空页面移入回收站"""
+        try:
+            page = await page_future
+        except Exception:
+            return
+        try:
+            await asyncio.to_thread(self.notion_service.trash_page, page["id"])
+        except Exception as e:
+            self._log_line(f"   ⚠️ 清理空白周报页面失败: {e}")
+
+    async def agenerate_and_publish(self) -> dict:
+        """生成并发布周报（异步版本）
+
+        启用 async_mode 时，周报页面框架在获取任务后即并发创建，
+        与 Git 提交获取、DeepSeek 生成重叠，最后只需追加内容；
+        否则在内容生成后一次性创建页面。
+        Notion 为同步客户端，放到线程中执行。
+        """
+        self._clear_run_caches()
+        self._log_line("🚀 开始生成周报...")
 
         # 1. 获取本周时间范围
         week_start, week_end = self.notion_service.get_week_range()
         week_start_str = week_start.strftime("%Y-%m-%d")
         week_end_str = week_end.strftime("%Y-%m-%d")
-        print(f"📅 周期：{week_start_str} 至 {week_end_str}")
+        self._log_line(f"📅 周期：{week_start_str} 至 {week_end_str}")
 
         # 2. 获取本周任务（带层级）
-        print("📋 正在获取本周任务...")
-        tasks = self.notion_service.get_weekly_tasks()
+        self._log_line("📋 正在获取本周任务...")
+        self._flush_log()
+        tasks = await asyncio.to_thread(self._get_weekly_tasks, week_start, week_end)
 
-        # 统计任务数量
-        total_count, completed_count, in_progress_count = _count_all_tasks(tasks)
-        print(f"   找到 {total_count} 个相关任务（{len(tasks)} 个顶级任务）")
-
-        if tasks:
-            print(f"   - 已完成: {completed_count} 个")
-            print(f"   - 进行中: {in_progress_count} 个")
-
-            # 3. 获取 Git 提交历史（如果启用）
-            if self.github_service:
-                print("\n🔍 正在获取 Git 提交历史...")
-                self._fetch_git_commits_for_tasks(tasks, week_start, week_end)
-
-            # 打印任务详情（带层级）
-            print("\n📝 任务列表:")
-            for task in tasks:
-                _print_task_tree(task)
-
-        # 4. 使用 DeepSeek 生成周报内容
-        print("\n🤖 正在使用 DeepSeek 生成周报...")
-        report_content = self.deepseek_service.generate_weekly_report(
-            tasks=tasks,
-            week_start=week_start_str,
-            week_end=week_end_str,
-        )
-        print("   周报内容生成完成")
-
-        # 5. 生成周报标题
+        # 3. 生成周报标题；启用 async_mode 时并发创建页面框架
         report_title = f"周报 {week_start_str} ~ {week_end_str}"
+        page_future: asyncio.Future | None = None
+        if self.settings.async_mode:
+            page_future = asyncio.ensure_future(
+                asyncio.to_thread(
+                    self.notion_service.create_report_page,
+                    report_title,
+                    week_start,
+                    week_end,
+                )
+            )
+
+        try:
+            # 单次遍历任务树：统计数量，并收集打印节点与带 Git 仓库的任务
+            scan = _scan_task_tree(tasks)
+            total_count = scan.total
+            self._log_line(f"   找到 {total_count} 个相关任务（{len(tasks)} 个顶级任务）")
+
+            if tasks:
+                self._log_line(f"   - 已完成: {scan.completed} 个")
+                self._log_line(f"   - 进行中: {scan.in_progress} 个")
+
+                # 4. 获取 Git 提交历史（如果启用）
+                if self.github_service:
+                    self._log_line("\n🔍 正在获取 Git 提交历史...")
+                    self._flush_log()
+                    await self._afetch_git_commits_for_tasks(
+                        scan.repo_tasks, week_start, week_end
+                    )
 
-        # 6. 发布到 Notion
-        print("\n📤 正在发布到 Notion...")
-        result = self.notion_service.create_weekly_report(
-            title=report_title,
-            content=report_content,
-            start_date=week_start,
-            end_date=week_end,
-        )
-        print("   ✅ 周报已发布!")
-        print(f"   📎 链接: https://notion.so/{result['id'].replace('-', '')}")
+                # 打印任务详情（带层级），整体拼接后一次写出
+                lines = ["", "📝 任务列表:"]
+                for task, indent in scan.nodes:
+                    _format_task_node(task, indent, lines)
+                self._log_lines(lines)
+
+            # 5. 使用 DeepSeek 生成周报内容
+            self._log_line("\n🤖 正在使用 DeepSeek 生成周报...")
+            self._flush_log()
+            report_content = await self.deepseek_service.agenerate_weekly_report(
+                tasks=tasks,
+                week_start=week_start_str,
+                week_end=week_end_str,
+            )
+            self._log_line("   周报内容生成完成")
+
+            # 6. 发布到 Notion
+            self._log_line("\n📤 正在发布到 Notion...")
+            self._flush_log()
+            if page_future is not None:
+                # 等待页面框架创建完成后追加内容；追加失败时同样清理页面
+                result = await page_future
+                await asyncio.to_thread(
+                    self.notion_service.append_report_content,
+                    result["id"],
+                    report_content,
+                )
+        except BaseException:
+            # 包括 Ctrl+C 等取消（CancelledError 不属于 Exception），不留下空白页面
+            if page_future is not None:
+                await self._discard_report_page(page_future)
+            self._flush_log()
+            raise
+
+        if page_future is None:
+            result = await asyncio.to_thread(
+                self.notion_service.create_weekly_report,
+                title=report_title,
+                content=report_content,
+                start_date=week_start,
+                end_date=week_end,
+            )
+        self._log_line("   ✅ 周报已发布!")
+        self._log_line(f"   📎 链接: https://notion.so/{result['id'].replace('-', '')}")
+        self._flush_log()
 
         return {
             "success": True,
@@ -180,6 +478,10 @@ class WeeklyReportGenerator:
             "content": report_content,
         }
 
+    def generate_and_publish(self) -> dict:
+        """生成并发布周报"""
+        return asyncio.run(self.agenerate_and_publish())
+
 
 def run_report_generation(config_path: Path | None = None) -> dict:
     """运行周报生成（供外部调用）"""
@@ -6,8 +6,11 @@ from pathlib import Path
 
 import schedule
 
-from .config import Settings, get_settings
-from .report_generator import run_report_generation
+from .config import Settings, get_cached_settings
+from .report_generator import WeeklyReportGenerator
+
+# 调度循环单次休眠的最长时间（秒）
+MAX_IDLE_SECONDS = 3600
 
 
 class ReportScheduler:
@@ -17,11 +20,25 @@ class ReportScheduler:
         self, settings: Settings | None = None, config_path: Path | None = None
     ):
         if settings is None:
-            settings = get_settings(config_path)
+            settings = get_cached_settings(config_path)
         self.settings = settings
         self.config_path = config_path
+        # 跨多次定时任务复用的周报生成器，保留各服务的 HTTP 连接池
+        self._generator: WeeklyReportGenerator | None = None
         self._setup_schedule()
 
+    def _get_generator(self) -> WeeklyReportGenerator:
+        """获取复用的周报生成器，配置文件修改后重新创建"""
+        # 配置文件未修改时返回同一个 Settings 实例
+        settings = get_cached_settings(self.config_path)
+        generator = self._generator
+        if generator is None or generator.settings is not settings:
+            if generator is not None:
+                generator.close()
+            generator = WeeklyReportGenerator(settings=settings)
+            self._generator = generator
+        return generator
+
     def _setup_schedule(self):
         """设置定时任务"""
         day = self.settings.schedule_day.lower()
@@ -55,7 +72,7 @@ class ReportScheduler:
         print("=" * 50)
 
         try:
-            result = run_report_generation(self.config_path)
+            result = self._get_generator().generate_and_publish()
             print("\n✅ 周报生成成功!")
             print(f"   链接: {result['url']}")
         except Exception as e:
@@ -74,8 +91,13 @@ class ReportScheduler:
 
         try:
             while True:
+                # 直接休眠到下次执行时间，而不是每分钟轮询；
+                # 单次最多休眠一小时，以应对系统时间调整或休眠唤醒
+                idle_seconds = schedule.idle_seconds()
+                if idle_seconds is None:
+                    idle_seconds = MAX_IDLE_SECONDS
+                time.sleep(min(max(idle_seconds, 1), MAX_IDLE_SECONDS))
                 schedule.run_pending()
-                time.sleep(60)  # 每分钟检查一次
         except KeyboardInterrupt:
             print("\n\n👋 调度器已停止")
 